@@ -1,11 +1,17 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
-import networkx as nx
 from matplotlib import colors
-import random
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from numba import njit
 from PIL import Image
-import io
+from scipy import sparse
 import os
+import sys
 
 def numgrid(shape, n):
     """
@@ -15,297 +21,414 @@ def numgrid(shape, n):
     if shape == 'S':  # Square region
         grid = np.zeros((n, n), dtype=int)
         # Number interior points sequentially
-        counter = 1
-        for i in range(1, n-1):
-            for j in range(1, n-1):
-                grid[i, j] = counter
-                counter += 1
+        grid[1:-1, 1:-1] = np.arange(1, (n - 2)**2 + 1).reshape(n - 2, n - 2)
         return grid
     return None
 
 def delsq(grid):
     """
     Recreate MATLAB's delsq function
-    Creates discrete Laplacian for the grid
+    Creates the discrete Laplacian for the grid as a sparse CSR matrix
     """
-    n = grid.shape[0]
-    size = np.max(grid)  # Total number of interior points
+    size = int(np.max(grid))  # Total number of interior points
     if size == 0:
-        return np.zeros((0, 0))
-    
-    # Create sparse Laplacian matrix
-    D = np.zeros((size, size))
-    
-    for i in range(n):
-        for j in range(n):
-            current = grid[i, j]
-            if current == 0:
-                continue
-                
-            # Check neighbors: up, down, left, right
-            neighbors = []
-            if i > 0 and grid[i-1, j] > 0:  # up
-                neighbors.append(grid[i-1, j])
-            if i < n-1 and grid[i+1, j] > 0:  # down  
-                neighbors.append(grid[i+1, j])
-            if j > 0 and grid[i, j-1] > 0:  # left
-                neighbors.append(grid[i, j-1])
-            if j < n-1 and grid[i, j+1] > 0:  # right
-                neighbors.append(grid[i, j+1])
-            
-            # Diagonal: number of neighbors
-            D[current-1, current-1] = len(neighbors)
-            
-            # Off-diagonal: -1 for connections
-            for neighbor in neighbors:
-                D[current-1, neighbor-1] = -1
-    
-    return D
+        return sparse.csr_matrix((0, 0))
+
+    # Off-diagonal -1 entries: vertically and horizontally adjacent
+    # interior points, found with shifted slices instead of a cell loop
+    rows = []
+    cols = []
+    for a, b in ((grid[:-1, :], grid[1:, :]), (grid[:, :-1], grid[:, 1:])):
+        mask = (a > 0) & (b > 0)
+        rows.append(a[mask] - 1)
+        cols.append(b[mask] - 1)
+        rows.append(b[mask] - 1)
+        cols.append(a[mask] - 1)
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    data = np.full(rows.size, -1.0)
+
+    # Diagonal: number of interior neighbors of each point
+    diag = np.arange(size)
+    degrees = np.bincount(rows, minlength=size)
+
+    rows = np.concatenate((rows, diag))
+    cols = np.concatenate((cols, diag))
+    data = np.concatenate((data, degrees.astype(float)))
+
+    return sparse.csr_matrix((data, (rows, cols)), shape=(size, size))
 
-def wall(p, q, m):
+def _neighbor_table(m):
     """
-    Calculate which barrier to remove between cells p and q
-    Converts 1D cell indices to 2D barrier coordinates
+    Per-cell neighbor lookup table for the m x m cell grid
+    Column order is (left, right, up, down) with -1 where the boundary
+    cuts a neighbor off; row 0 is unused since cells are 1-based
     """
-    # Convert 1D cell indices to 2D coordinates in cell grid
-    row_p = (p - 1) // m
-    col_p = (p - 1) % m
-    row_q = (q - 1) // m  
-    col_q = (q - 1) % m
-    
-    # The wall between cells p and q is at:
-    # For horizontal move: barrier at (max(row_p, row_q), col_p * 2 + 1)
-    # For vertical move: barrier at (row_p * 2 + 1, max(col_p, col_q))
-    
-    if row_p == row_q:  # Horizontal move
-        barrier_row = row_p * 2 + 1
-        barrier_col = max(col_p, col_q) * 2 + 2
-    else:  # Vertical move
-        barrier_row = max(row_p, row_q) * 2 + 2
-        barrier_col = col_p * 2 + 1
-    
-    # Convert to 1D index in barrier graph
-    n_barriers = m * 2 + 1
-    i = barrier_row * n_barriers + barrier_col
-    
-    # For simplicity, we'll use a different approach
-    # Just return unique identifiers for the barrier
-    return min(p, q), max(p, q)
+    table = np.full((m * m + 1, 4), -1, dtype=np.int32)
+    cells = np.arange(1, m * m + 1, dtype=np.int32).reshape(m, m)
+    table[cells[:, 1:], 0] = cells[:, :-1]   # left
+    table[cells[:, :-1], 1] = cells[:, 1:]   # right
+    table[cells[1:, :], 2] = cells[:-1, :]   # up
+    table[cells[:-1, :], 3] = cells[1:, :]   # down
+    return table
 
-def generate_maze(n=15, branching='middle', create_gif=True):
+def _make_carver(branching_code):
+    """
+    Compile a maze-carving kernel specialized for one branching strategy
+    branching_code (0=first, 1=last, 2=middle) is closed over as a
+    compile-time constant, so the JIT folds the per-backtrack dispatch
+    away instead of re-testing it on every pop
+    """
+    @njit(cache=True)
+    def carve(m, seed, nbr_table):
+        """
+        Carve a random spanning tree of the m x m cell grid with DFS
+        Cells are numbered 1..m*m and nbr_table comes from
+        _neighbor_table(m)
+        Returns the tree edges in carve order as an (m*m - 1, 2) array
+        """
+        np.random.seed(seed)
+
+        visited = np.zeros(m * m + 1, np.uint8)
+        branches = np.empty(m * m, np.int32)
+        alive = np.zeros(m * m, np.uint8)  # Slots not yet popped
+        head = 0  # branches live in branches[head:tail]
+        tail = 0
+        nlive = 0
+        tree = np.empty((m * m - 1, 2), np.int32)
+        count = 0
+        nbrs = np.empty(4, np.int32)
+
+        # Pregenerated pool of random ints, consumed one per step and
+        # refilled when exhausted
+        rng_pool = np.empty(1 << 14, np.int64)
+        for i in range(rng_pool.size):
+            rng_pool[i] = np.random.randint(1 << 30)
+        rng_i = 0
+
+        p = 1  # Start at first cell
+        visited[p] = 1
+        remaining = m * m - 1  # Unvisited cells
+
+        while remaining > 0:
+            # Gather unvisited neighbors of the current cell
+            nb = 0
+            for k in range(4):
+                q = nbr_table[p, k]
+                if q > 0 and visited[q] == 0:
+                    nbrs[nb] = q
+                    nb += 1
+
+            if nb > 0:
+                # Random choice from the unvisited neighbors
+                if rng_i == rng_pool.size:
+                    for i in range(rng_pool.size):
+                        rng_pool[i] = np.random.randint(1 << 30)
+                    rng_i = 0
+                q = nbrs[rng_pool[rng_i] % nb]
+                rng_i += 1
+                tree[count, 0] = p
+                tree[count, 1] = q
+                count += 1
+                visited[q] = 1
+                remaining -= 1
+
+                # If multiple choices, remember this branch point
+                if nb > 1:
+                    branches[tail] = p
+                    alive[tail] = 1
+                    tail += 1
+                    nlive += 1
+
+                p = q
+            else:
+                # Backtrack
+                if nlive == 0:
+                    break
+
+                if branching_code == 0:  # 'first'
+                    p = branches[head]
+                    alive[head] = 0
+                    head += 1
+                elif branching_code == 1:  # 'last'
+                    tail -= 1
+                    p = branches[tail]
+                    alive[tail] = 0
+                else:  # 'middle'
+                    # Scan outward from the middle slot for a live entry;
+                    # popped slots just go dead instead of shifting the array
+                    mid = head + (tail - head) // 2
+                    off = 0
+                    while True:
+                        if mid + off < tail and alive[mid + off] == 1:
+                            mid = mid + off
+                            break
+                        if mid - off >= head and alive[mid - off] == 1:
+                            mid = mid - off
+                            break
+                        off += 1
+                    p = branches[mid]
+                    alive[mid] = 0
+                nlive -= 1
+
+                # Compact once dead slots outnumber live ones
+                if tail - head > 2 * nlive:
+                    j = head
+                    for i in range(head, tail):
+                        if alive[i] == 1:
+                            branches[j] = branches[i]
+                            alive[j] = 1
+                            j += 1
+                    for i in range(j, tail):
+                        alive[i] = 0
+                    tail = j
+
+        return tree[:count]
+
+    return carve
+
+# One compiled kernel per branching strategy, picked once at entry
+_CARVERS = {name: _make_carver(code)
+            for name, code in (('first', 0), ('last', 1), ('middle', 2))}
+
+def _open_walls_from_tree(tree, m):
+    """
+    Build the open-wall flags for the m x m cell grid from tree edges
+    One (left, right, up, down) byte row per cell; 1 means the wall to
+    that neighbor has been carved away
+    """
+    open_walls = np.zeros((m * m, 4), dtype=np.uint8)
+    if len(tree) == 0:
+        return open_walls
+
+    edges = np.asarray(tree)
+    p = edges[:, 0]
+    q = edges[:, 1]
+    # (step to q, direction seen from p, direction seen from q)
+    for delta, d_pq, d_qp in ((-1, 0, 1), (1, 1, 0), (-m, 2, 3), (m, 3, 2)):
+        mask = q == p + delta
+        open_walls[p[mask] - 1, d_pq] = 1
+        open_walls[q[mask] - 1, d_qp] = 1
+    return open_walls
+
+def _wall_segments(open_walls, m):
+    """
+    Interior walls still standing, as an (N, 2, 2) array of (x, y)
+    endpoint pairs ready for a LineCollection
+    """
+    ow = open_walls.reshape(m, m, 4)
+
+    # Vertical walls between (i, j) and (i, j+1)
+    rows, cols = np.nonzero(ow[:, :-1, 1] == 0)
+    v = np.empty((rows.size, 2, 2))
+    v[:, 0, 0] = cols + 1
+    v[:, 0, 1] = rows
+    v[:, 1, 0] = cols + 1
+    v[:, 1, 1] = rows + 1
+
+    # Horizontal walls between (i, j) and (i+1, j)
+    rows, cols = np.nonzero(ow[:-1, :, 3] == 0)
+    h = np.empty((rows.size, 2, 2))
+    h[:, 0, 0] = cols
+    h[:, 0, 1] = rows + 1
+    h[:, 1, 0] = cols + 1
+    h[:, 1, 1] = rows + 1
+
+    return np.concatenate((v, h))
+
+# Fixed GIF palette: the frames only ever contain these colors
+# (white background, lightgray cells, red tree, green/blue current
+# cell, black walls, plus two grays for antialiased edges)
+_GIF_PALETTE = [
+    255, 255, 255,
+    211, 211, 211,
+    255, 0, 0,
+    0, 128, 0,
+    0, 0, 255,
+    0, 0, 0,
+    128, 128, 128,
+    64, 64, 64,
+]
+
+def _palette_image():
+    """1x1 P-mode image carrying the fixed GIF palette"""
+    palette_img = Image.new('P', (1, 1))
+    palette_img.putpalette(_GIF_PALETTE + [0] * (768 - len(_GIF_PALETTE)))
+    return palette_img
+
+# Per-process state for GIF frame rendering: (fig, artists, tree, m),
+# built once per worker by _init_frame_worker
+_frame_state = None
+
+def _init_frame_worker(tree, m):
+    """Set up the persistent figure and artists in a render worker"""
+    global _frame_state
+    fig, artists = _init_gif_figure(m)
+    _frame_state = (fig, artists, tree, m)
+
+def _render_snapshot(snapshot):
+    """Render one (step, current cell, final?) snapshot to raw bytes"""
+    fig, artists, tree, m = _frame_state
+    k, current_cell, final = snapshot
+    update_maze_frame(artists, tree[:k], current_cell, m, k, final)
+
+    # Grab the canvas, drop the alpha channel and quantize to the fixed
+    # palette; frames cross the process boundary as raw P-mode bytes,
+    # skipping any PNG encode/decode
+    fig.canvas.draw()
+    rgb = np.ascontiguousarray(np.asarray(fig.canvas.buffer_rgba())[..., :3])
+    frame = Image.fromarray(rgb).quantize(palette=_palette_image(), dither=Image.Dither.NONE)
+    return frame.tobytes(), frame.size
+
+def _frame_from_payload(payload):
+    """Rebuild a P-mode frame from the raw bytes a worker sent back"""
+    data, size = payload
+    frame = Image.frombytes('P', size, data)
+    frame.putpalette(_GIF_PALETTE + [0] * (768 - len(_GIF_PALETTE)))
+    return frame
+
+def generate_maze(n=15, branching='middle', create_gif=True, seed=None):
     """
     Generate a random maze using DFS with backtracking
     """
     m = n - 1  # Cell grid size
-    
+
     print(f"Generating {n}x{n} barrier grid -> {m}x{m} cell grid")
     print(f"Expected cells: 1 to {m*m}")
 
-    # Create cell graph C - we'll build this manually
-    C = nx.Graph()
-    
-    # Add all cells as nodes
-    for i in range(1, m*m + 1):
-        C.add_node(i)
-    
-    # Initialize algorithm state
-    available = list(range(1, m*m + 1))  # Nodes we haven't visited
-    branches = []
-    tree = []  # Will store edges as (p, q) pairs
-    p = 1  # Start at first cell
-    
-    # For GIF creation
-    gif_frames = []
-    
-    iteration = 0
-    while available:
-        iteration += 1
-        if iteration > 10000:  # Safety break
-            print("Iteration limit reached")
-            break
-            
-        # Mark current cell as visited
-        if p in available:
-            available.remove(p)
-        
-        # Get unvisited neighbors
-        unvisited_neighbors = []
-        
-        # Check all four possible neighbors
-        current_row = (p - 1) // m
-        current_col = (p - 1) % m
-        
-        # Left neighbor
-        if current_col > 0:
-            left_neighbor = p - 1
-            if left_neighbor in available:
-                unvisited_neighbors.append(left_neighbor)
-        
-        # Right neighbor  
-        if current_col < m - 1:
-            right_neighbor = p + 1
-            if right_neighbor in available:
-                unvisited_neighbors.append(right_neighbor)
-        
-        # Up neighbor
-        if current_row > 0:
-            up_neighbor = p - m
-            if up_neighbor in available:
-                unvisited_neighbors.append(up_neighbor)
-        
-        # Down neighbor
-        if current_row < m - 1:
-            down_neighbor = p + m
-            if down_neighbor in available:
-                unvisited_neighbors.append(down_neighbor)
-
-        if unvisited_neighbors:
-            # Random choice from available neighbors
-            q = random.choice(unvisited_neighbors)
-            tree.append((p, q))
-            
-            # Add edge to cell graph
-            C.add_edge(p, q)
-            
-            # If multiple choices, remember this branch point
-            if len(unvisited_neighbors) > 1:
-                branches.append(p)
-            
-            p = q
-            
-            # Capture frame for GIF (only capture every few steps to reduce file size)
-            if create_gif and iteration % 2 == 0:  # Capture every 2nd step
-                frame = capture_maze_frame(C, tree, p, m, iteration)
-                gif_frames.append(frame)
-                
-        else:
-            # Backtrack
-            if not branches:
-                break
-                
-            if branching == 'first':
-                idx = 0
-            elif branching == 'last':
-                idx = len(branches) - 1
-            else:  # 'middle'
-                idx = len(branches) // 2
-                
-            p = branches[idx]
-            del branches[idx]
-    
-    print(f"Maze generation complete. Graph has {C.number_of_nodes()} nodes and {C.number_of_edges()} edges")
-    print(f"Nodes in graph: {sorted(list(C.nodes()))[:10]}...")  # Show first 10 nodes
-    
-    # Create GIF if requested
-    if create_gif and gif_frames:
-        # Add a few extra frames at the end to show completion
-        for _ in range(3):
-            final_frame = capture_maze_frame(C, tree, p, m, iteration, final=True)
-            gif_frames.append(final_frame)
-        
-        gif_path = create_maze_gif(gif_frames)
-        return C, tree, gif_path
-    
-    return C, tree, None
+    if seed is None:
+        seed = np.random.randint(2**31 - 1)
+
+    # Carve the spanning tree in compiled code
+    tree = _CARVERS[branching](m, seed, _neighbor_table(m))
+
+    # Record the carved edges as per-cell open-wall flags
+    open_walls = _open_walls_from_tree(tree, m)
+
+    print(f"Maze generation complete. Tree has {len(tree)} edges over {m*m} cells")
+
+    # Create GIF if requested, replaying construction from the edge list
+    if create_gif and len(tree) > 0:
+        # Lightweight snapshots: (steps carved, current cell, final?)
+        # Every 2nd step to reduce file size, plus a few completion frames
+        snapshots = [(k, int(tree[k-1, 1]), False) for k in range(2, len(tree) + 1, 2)]
+        snapshots += [(len(tree), int(tree[-1, 1]), True)] * 3
+
+        # Frames are independent once the snapshots exist, so rasterize
+        # them in parallel with one persistent figure per worker
+        # (capped: each worker holds a full matplotlib figure)
+        max_workers = min(os.cpu_count() or 1, 8)
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_frame_worker,
+                                 initargs=(tree, m)) as ex:
+            gif_frames = (_frame_from_payload(payload)
+                          for payload in ex.map(_render_snapshot, snapshots))
+            gif_path = create_maze_gif(gif_frames, len(snapshots))
+        return open_walls, tree, gif_path
+
+    return open_walls, tree, None
+
+def _init_gif_figure(m):
+    """
+    Build the persistent figure and artists reused for every GIF frame
+    Uses its own Agg canvas so the pyplot state is untouched
+    """
+    # Half the old 12x6 canvas: quantize and LZW-encode time scale with
+    # pixel count and the GIF is small on screen anyway
+    fig = Figure(figsize=(6, 3), dpi=80)
+    FigureCanvasAgg(fig)
+    ax1, ax2 = fig.subplots(1, 2)
+
+    # Cell center coordinates, indexed by cell id - 1
+    cells = np.arange(m * m)
+    pos_xy = np.column_stack((cells % m, cells // m)).astype(np.float32)
+
+    # Static background: all cells
+    ax1.scatter(pos_xy[:, 0], pos_xy[:, 1], s=50, c='lightgray')
+
+    # Artists updated in place per frame
+    tree_lc = LineCollection([], colors='red', linewidths=2)
+    ax1.add_collection(tree_lc)
+    current_scat = ax1.scatter([], [], s=100, c='green', zorder=3)
+    walls_lc = LineCollection([], colors='k', linewidths=2)
+    ax2.add_collection(walls_lc)
+
+    # Draw outer walls
+    ax2.set_title('Maze Walls')
+    ax2.plot([0, m], [0, 0], 'k-', linewidth=3)  # Bottom
+    ax2.plot([0, m], [m, m], 'k-', linewidth=3)  # Top
+    ax2.plot([0, 0], [0, m], 'k-', linewidth=3)  # Left
+    ax2.plot([m, m], [0, m], 'k-', linewidth=3)  # Right
+
+    for ax in (ax1, ax2):
+        ax.set_aspect('equal')
+        ax.set_xlim(-1, m)
+        ax.set_ylim(-1, m)
+
+    return fig, (ax1, pos_xy, tree_lc, current_scat, walls_lc)
+
+def update_maze_frame(artists, tree, current_cell, m, iteration, final=False):
+    """Update the persistent artists to show the current maze state"""
+    ax1, pos_xy, tree_lc, current_scat, walls_lc = artists
 
-def capture_maze_frame(C, tree, current_cell, m, iteration, final=False):
-    """Capture current maze state as an image frame"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
-    
-    # Plot cell graph and current path
     if final:
         ax1.set_title(f'Maze Complete! (Step {iteration})')
     else:
         ax1.set_title(f'Maze Construction Progress (Step {iteration})')
-    
-    pos_C = {i: ((i-1) % m, (i-1) // m) for i in C.nodes()}
-    
-    # Draw all cells
-    nx.draw_networkx_nodes(C, pos_C, ax=ax1, node_size=50, node_color='lightgray')
-    
-    # Draw current tree edges
-    if tree:
-        tree_graph = nx.Graph()
-        tree_graph.add_edges_from(tree)
-        nx.draw_networkx_edges(tree_graph, pos_C, ax=ax1, edge_color='red', width=2)
-    
+
+    # Current tree edges, looked up from the precomputed positions
+    edges = np.asarray(tree)
+    tree_lc.set_segments(pos_xy[edges - 1])
+
     # Highlight current cell
-    if current_cell in pos_C:
-        node_color = 'blue' if final else 'green'
-        nx.draw_networkx_nodes(C, pos_C, nodelist=[current_cell], ax=ax1, 
-                              node_size=100, node_color=node_color)
-    
-    # Plot the maze representation
-    ax2.set_title('Maze Walls')
-    plot_maze_walls(ax2, C, m)
-    
-    ax1.set_aspect('equal')
-    ax2.set_aspect('equal')
-    ax1.set_xlim(-1, m)
-    ax1.set_ylim(-1, m)
-    ax2.set_xlim(-1, m)
-    ax2.set_ylim(-1, m)
-    
-    # Convert plot to image
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=80)  # Reduced DPI for smaller file
-    buf.seek(0)
-    plt.close(fig)  # Close the figure to free memory
-    return Image.open(buf)
-
-def create_maze_gif(frames, filename="maze_construction.gif"):
-    """Create and save an animated GIF from the frames"""
-    if not frames:
-        print("No frames to create GIF")
-        return None
-    
+    current_scat.set_offsets(pos_xy[current_cell - 1:current_cell])
+    current_scat.set_color('blue' if final else 'green')
+
+    # Walls of the partially carved maze
+    walls_lc.set_segments(_wall_segments(_open_walls_from_tree(tree, m), m))
+
+def create_maze_gif(frames, n_frames, filename="maze_construction.gif", interactive=False):
+    """Create and save an animated GIF, streaming frames to disk"""
     # Save in current directory (works in Colab)
     gif_path = filename
-    
-    # Save as GIF
-    frames[0].save(
+
+    # append_images takes any iterable, so the encoder pulls frames one
+    # at a time instead of the whole list sitting in memory; they
+    # arrive already quantized, so skip Pillow's optimize pass
+    frames = iter(frames)
+    first = next(frames)
+    first.save(
         gif_path,
         save_all=True,
-        append_images=frames[1:],
+        append_images=frames,
         duration=400,  # milliseconds per frame
         loop=0,  # 0 = infinite loop
-        optimize=True,
-        quality=85  # Reduce quality for smaller file
+        optimize=False,
     )
-    
+
     print(f"Animated GIF saved to: {gif_path}")
-    print(f"Total frames: {len(frames)}")
+    print(f"Total frames: {n_frames}")
     print(f"File size: {os.path.getsize(gif_path) / 1024:.1f} KB")
-    
-    # Display the GIF in Colab
-    from IPython.display import Image as IPImage
-    display(IPImage(filename=gif_path))
-    
-    # Provide download link
-    from google.colab import files
-    files.download(gif_path)
-    
+
+    if interactive:
+        # Display the GIF inline; the import stays lazy since it costs
+        # ~100 ms and batch runs never need it
+        from IPython.display import Image as IPImage, display
+        display(IPImage(filename=gif_path))
+
+        # Provide a download link when actually running in Colab
+        if 'google.colab' in sys.modules:
+            from google.colab import files
+            files.download(gif_path)
+
     return gif_path
 
-def plot_maze_walls(ax, C, m):
+def plot_maze_walls(ax, open_walls, m):
     """Plot the maze as walls between cells"""
-    # Draw all possible walls
-    for i in range(m):
-        for j in range(m):
-            cell = i * m + j + 1
-            x, y = j, i
-            
-            # Check right wall
-            if j < m - 1:
-                right_cell = cell + 1
-                if not C.has_edge(cell, right_cell):
-                    ax.plot([x + 1, x + 1], [y, y + 1], 'k-', linewidth=2)
-            
-            # Check bottom wall
-            if i < m - 1:
-                bottom_cell = cell + m
-                if not C.has_edge(cell, bottom_cell):
-                    ax.plot([x, x + 1], [y + 1, y + 1], 'k-', linewidth=2)
+    # Draw all interior walls as a single collection rather than one
+    # Line2D artist per wall
+    ax.add_collection(LineCollection(_wall_segments(open_walls, m),
+                                     colors='k', linewidths=2))
     
     # Draw outer walls
     ax.plot([0, m], [0, 0], 'k-', linewidth=3)  # Bottom
@@ -313,29 +436,19 @@ def plot_maze_walls(ax, C, m):
     ax.plot([0, 0], [0, m], 'k-', linewidth=3)  # Left
     ax.plot([m, m], [0, m], 'k-', linewidth=3)  # Right
 
-def plot_final_maze(C, m, path=None):
+def plot_final_maze(open_walls, m, path=None):
     """Plot the final maze"""
     plt.figure(figsize=(10, 10))
-    
+
     # Plot the maze walls
-    plot_maze_walls(plt.gca(), C, m)
+    plot_maze_walls(plt.gca(), open_walls, m)
     
     # Highlight solution path if provided
     if path:
-        # Draw path through centers of cells
-        for i in range(len(path) - 1):
-            cell1 = path[i]
-            cell2 = path[i + 1]
-            
-            row1 = (cell1 - 1) // m
-            col1 = (cell1 - 1) % m
-            row2 = (cell2 - 1) // m
-            col2 = (cell2 - 1) % m
-            
-            x1, y1 = col1 + 0.5, row1 + 0.5
-            x2, y2 = col2 + 0.5, row2 + 0.5
-            
-            plt.plot([x1, x2], [y1, y2], 'r-', linewidth=3)
+        # Draw path through centers of cells, converting every cell id
+        # to (x, y) in one vectorized divmod instead of per-cell ints
+        cells = np.asarray(path) - 1
+        plt.plot(cells % m + 0.5, cells // m + 0.5, 'r-', linewidth=3)
     
     plt.title(f'Random Maze ({m}x{m})')
     plt.axis('equal')
@@ -343,52 +456,63 @@ def plot_final_maze(C, m, path=None):
     plt.tight_layout()
     plt.show()
 
-def solve_maze(C, start=1, end=None):
+def solve_maze(open_walls, start=1, end=None):
     """Find shortest path through maze"""
+    m = int(np.sqrt(open_walls.shape[0]))
     if end is None:
         # Use the bottom-right corner cell
-        m = int(np.sqrt(len(C.nodes())))
         end = m * m
-    
+
+    n_edges = int(open_walls[:, 1].sum() + open_walls[:, 3].sum())
     print(f"Looking for path from {start} to {end}")
-    print(f"Graph nodes: {len(C.nodes())}, edges: {len(C.edges())}")
-    
-    # Verify nodes exist
-    if start not in C:
-        print(f"Start node {start} not in graph")
-        return None
-    if end not in C:
-        print(f"End node {end} not in graph")
-        # Find the actual last node
-        end = max(C.nodes())
-        print(f"Using last node: {end}")
-    
-    try:
-        path = nx.shortest_path(C, start, end)
-        print(f"Found path with {len(path)} steps")
-        return path
-    except nx.NetworkXNoPath:
+    print(f"Cells: {m*m}, open walls: {n_edges}")
+
+    # BFS over the open-wall flags with a flat predecessor array
+    nbr_table = _neighbor_table(m)
+    prev = np.full(m * m + 1, -1, dtype=np.int32)
+    prev[start] = start
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        if cell == end:
+            break
+        for k in range(4):
+            if open_walls[cell - 1, k]:
+                q = int(nbr_table[cell, k])
+                if prev[q] == -1:
+                    prev[q] = cell
+                    queue.append(q)
+
+    if prev[end] == -1:
         print("No path exists between start and end")
         return None
 
+    # Walk the predecessor chain back from the end
+    path = [end]
+    while path[-1] != start:
+        path.append(int(prev[path[-1]]))
+    path.reverse()
+    print(f"Found path with {len(path)} steps")
+    return path
+
 # Example usage
 if __name__ == "__main__":
     # Generate maze with GIF creation
     n = 11  # Smaller for faster GIF creation
-    C, tree, gif_path = generate_maze(n=n, branching='middle', create_gif=False)
-    
+    open_walls, tree, gif_path = generate_maze(n=n, branching='middle', create_gif=False)
+
     m = n - 1
     print(f"Maze size: {m}x{m} cells")
-    
+
     # Plot final maze
-    plot_final_maze(C, m)
-    
+    plot_final_maze(open_walls, m)
+
     # Solve maze
-    path = solve_maze(C, 1, m*m)
+    path = solve_maze(open_walls, 1, m*m)
     if path:
         print(f"Solution path: {path}")
-        plot_final_maze(C, m, path)
+        plot_final_maze(open_walls, m, path)
     else:
         print("No solution path found")
         # Plot without path
-        plot_final_maze(C, m)
+        plot_final_maze(open_walls, m)